@@ -1,12 +1,15 @@
-import math
 import random
 from collections import OrderedDict
 
+# 跟踪文件中的操作类型编码
+OP_READ = 0
+OP_WRITE = 1
+
 class Memory:
     """内存类"""
     def __init__(self, size):
         self.size = size
-        self.data = [None] * size  # 初始化内存数据
+        self.data = bytearray(size)  # 初始化内存数据，按字节编址，初始为0
         self.access_count = 0  # 访问次数
     
     def read(self, address):
@@ -14,43 +17,54 @@ class Memory:
         if address < 0 or address >= self.size:
             raise ValueError("Address out of range")
         self.access_count += 1
-        if self.data[address] is None:
-            return 0
-        else:
-            return self.data[address]
+        return self.data[address]
     
     def write(self, address, data):
         """向内存写入数据"""
         if address < 0 or address >= self.size:
             raise ValueError("Address out of range")
         self.access_count += 1
-        self.data[address] = data
+        self.data[address] = data & 0xFF
+
+    def read_block(self, address, size):
+        """从内存连续读取size个字节，整块都必须在内存范围内"""
+        if address < 0 or address + size > self.size:
+            raise ValueError("Address out of range")
+        self.access_count += size
+        return self.data[address:address + size]
+
+    def write_block(self, address, data):
+        """从address开始连续写入data，超出内存末尾的部分被丢弃"""
+        if address < 0 or address >= self.size:
+            raise ValueError("Address out of range")
+        upper = min(address + len(data), self.size)
+        self.data[address:upper] = memoryview(data)[:upper - address]  # 通过memoryview切片，避免中间拷贝
+        self.access_count += upper - address
 
 class CacheBlock:
     """Cache块"""
-    def __init__(self,block_size):
+    __slots__ = ('tag', 'valid', 'dirty', 'block_size', 'data', 'base_address')  #固定属性，不为每个块分配__dict__
+
+    def __init__(self,block_size,data=None):
         self.tag = None   #标签
         self.valid = False  #有效位
         self.dirty = False  #脏位
         self.block_size = block_size #块大小
-        self.data = [None]* self.block_size  #数据
+        self.data = bytearray(self.block_size) if data is None else data  #数据，按字节存储；可直接传入从内存读出的块
         self.base_address = None  #整个块的起始主存地址
-        self.load_time = 0 #用于FIFO，记录进入Cache时间，每次访问Cache时+1
-        self.last_time = 0 #用于LRU，记录上次访问时间，每次访问Cache时+1，被访问后清零
 
 class CacheSet:
     """Cache组"""
     def __init__(self, associativity,policy,memory):
         self.memory = memory #内存类对象
-        self.blocks = OrderedDict()  #使用有序字典来实现LRU和FIFO
+        # 块按tag存放，队首即为替换对象：FIFO依赖dict本身的插入顺序，LRU需要OrderedDict在命中时移到末尾
+        self.blocks = OrderedDict() if policy == 'LRU' else {}
         self.associativity = associativity
         self.policy = policy
 
     def find_block(self, tag):
-        """在组内查找符合tag的Cache块"""
-        if tag in self.blocks:
-            return self.blocks[tag]
-        return None
+        """在组内查找符合tag的Cache块，未找到返回None"""
+        return self.blocks.get(tag)
     
     def add_block(self,block):
         """添加Cache块,如果组满了则根据策略删除一个块"""
@@ -60,37 +74,24 @@ class CacheSet:
 
     def evict_block(self):
         """根据策略驱逐Cache块"""
-        evict_tag = None
-
         if not self.blocks:
             return
-        
+
         if self.policy ==  'RANDOM':
             # 随机替换实现
             evict_tag = random.choice(list(self.blocks.keys()))
+            block = self.blocks.pop(evict_tag)
         elif self.policy == 'FIFO':
-            # FIFO替换实现:寻找组内load_time最小替换
-            temp = -1 
-            for tag,block in self.blocks.items():
-                if temp == -1 or block.load_time < temp:
-                    temp = block.load_time
-                    evict_tag = tag
-        elif self.policy == 'LRU':
-            # LRU替换实现：寻找组内last_time最小替换
-            temp = -1 
-            for tag,block in self.blocks.items():
-                if temp == -1 or block.last_time < temp:
-                    temp = block.last_time
-                    evict_tag = tag
-
-        if evict_tag is not None:
-            if self.blocks[evict_tag].dirty and self.blocks[evict_tag].data:
-                # 如果块是脏的，写回内存
-                for i in range(self.blocks[evict_tag].block_size):
-                    addr = self.blocks[evict_tag].base_address + i
-                    if addr < self.memory.size:  # 确保地址在有效范围内
-                        self.memory.write(addr, self.blocks[evict_tag].data[i])
-            del self.blocks[evict_tag]
+            # FIFO替换实现：队首即最早装入的块
+            evict_tag = next(iter(self.blocks))
+            block = self.blocks.pop(evict_tag)
+        else:
+            # LRU替换实现：队首即最久未使用的块
+            evict_tag, block = self.blocks.popitem(last=False)
+
+        if block.dirty:
+            # 如果块是脏的，整块写回内存
+            self.memory.write_block(block.base_address, block.data)
 
 
 class Cache:
@@ -99,7 +100,7 @@ class Cache:
 
         if cache_size <= 0 or block_size <= 0 or associativity <= 0:
             raise ValueError("Parameter 'Size' must be greater than 0")
-        if math.log2(cache_size) % 1 != 0  or math.log2(block_size) % 1 != 0 or math.log2(associativity) % 1 != 0:  
+        if cache_size & (cache_size - 1) or block_size & (block_size - 1) or associativity & (associativity - 1):  # 2的幂只有一个二进制1位
             raise ValueError("Parameter 'Size' must be a power of 2")
         if policy not in ['FIFO', 'LRU', 'RANDOM']:
             raise ValueError("Policy must be one of FIFO , LRU, RANDOM")    
@@ -108,111 +109,197 @@ class Cache:
         self.associativity = associativity
         self.policy = policy
         self.address_bit = address_bit    
+        self._addr_space = 1 << address_bit  # 地址空间大小，合法地址为[0, 2**address_bit)
         self.block_size = block_size
         self.set_count = int(cache_size / (block_size * associativity))  # 计算组数，确保为整数
         self.memory = memory
+        if self.set_count == 0:
+            raise ValueError("Parameter 'cache_size' must be at least block_size * associativity")
+
+        # 块大小与组数均为2的幂，地址分割可用移位和掩码代替除法和取模
+        self._block_shift = block_size.bit_length() - 1
+        self._offset_mask = block_size - 1
+        self._set_mask = self.set_count - 1
+        self._tag_shift = self._block_shift + self.set_count.bit_length() - 1
         
-        # 初始化统计数据
-        self.access_count = 0
-        self.hit_count = 0
+        # 初始化统计数据（总访问次数和总命中次数由读写计数求和得到，见access_count/hit_count）
+        self.reset_stats()
+
+        # 按Cache参数生成专用的读写函数：read(address, memory) / write(address, data, memory)
+        if self.associativity == 1:
+            # 直接映射：每组只有一个块，直接按组号存放
+            self.lines = [None] * self.set_count
+            self.read, self.write = self._make_direct_access()
+        else:
+            # 初始化Cache组：组号即列表下标
+            self.sets = [CacheSet(self.associativity, self.policy, self.memory) for _ in range(self.set_count)]
+            self.read, self.write = self._make_set_assoc_access()
+        
+
+    def load_block(self, address, tag, memory):
+        """未命中时从内存读取address所在的整块，创建新的Cache块"""
+        block_address = address & ~self._offset_mask
+        limit = min(block_address + self.block_size, self._addr_space)
+        data = memory.read_block(block_address, limit - block_address)
+
+        new_block = CacheBlock(self.block_size, data)
+        new_block.tag = tag
+        new_block.valid = True
+        new_block.dirty = False
+        new_block.base_address = block_address
+        return new_block
+
+    def _make_set_assoc_access(self):
+        """生成组相联Cache的读写函数"""
+        # Cache参数在初始化后不再变化，在此固定为闭包变量，每次访问不必再读取实例属性
+        addr_space = self._addr_space
+        offset_mask = self._offset_mask
+        block_shift = self._block_shift
+        set_mask = self._set_mask
+        tag_shift = self._tag_shift
+        sets = self.sets
+        lru = self.policy == 'LRU'
+        load_block = self.load_block
+
+        def read(address, memory):
+            """从Cache读取数据,如果不命中则从内存读取"""
+            self.read_count += 1
+
+            # 地址分割成tag, index, offset
+            if address >= addr_space:
+                raise ValueError("Address out of range")
+            offset = address & offset_mask
+            cache_set = sets[(address >> block_shift) & set_mask]
+            tag = address >> tag_shift
+
+            # 检查是否命中
+            block = cache_set.find_block(tag)
+            if block and block.valid:
+                # 命中
+                self.read_hit_count += 1
+
+                # LRU：将命中块移到队尾
+                if lru:
+                    cache_set.blocks.move_to_end(tag)
+
+                return block.data[offset]
+            else:
+                # 未命中，从内存读取
+                new_block = load_block(address, tag, memory)
+
+                # 将块添加到Cache
+                cache_set.add_block(new_block)
+
+                return new_block.data[offset]
+
+        def write(address, data, memory):
+            """写入数据到Cache"""
+            self.write_count += 1
+
+            # 地址分割成tag, index, offset
+            if address >= addr_space:
+                raise ValueError("Address out of range")
+            offset = address & offset_mask
+            cache_set = sets[(address >> block_shift) & set_mask]
+            tag = address >> tag_shift
+
+            # 检查是否命中
+            block = cache_set.find_block(tag)
+            if block and block.valid:
+                # 命中
+                self.write_hit_count += 1
+
+                # 更新数据
+                block.data[offset] = data & 0xFF
+
+                # 写回：标记为脏
+                block.dirty = True
+                # LRU：将命中块移到队尾
+                if lru:
+                    cache_set.blocks.move_to_end(tag)
+            else:
+                # 未命中直接写入内存
+                memory.write(address, data)
+
+        return read, write
+
+    def _make_direct_access(self):
+        """生成直接映射Cache的读写函数：每组只有一个块，只需比较一次tag，不命中时直接替换"""
+        addr_space = self._addr_space
+        offset_mask = self._offset_mask
+        block_shift = self._block_shift
+        set_mask = self._set_mask
+        tag_shift = self._tag_shift
+        lines = self.lines
+        load_block = self.load_block
+        write_back = self.memory.write_block
+
+        def read(address, memory):
+            """从Cache读取数据,如果不命中则从内存读取"""
+            self.read_count += 1
+
+            # 地址分割成tag, index, offset
+            if address >= addr_space:
+                raise ValueError("Address out of range")
+            offset = address & offset_mask
+            index = (address >> block_shift) & set_mask
+            tag = address >> tag_shift
+            block = lines[index]
+
+            if block and block.tag == tag:
+                # 命中
+                self.read_hit_count += 1
+                return block.data[offset]
+
+            # 未命中：原有块是脏的则写回，再从内存读取新块替换
+            if block and block.dirty:
+                write_back(block.base_address, block.data)
+            block = load_block(address, tag, memory)
+            lines[index] = block
+            return block.data[offset]
+
+        def write(address, data, memory):
+            """写入数据到Cache"""
+            self.write_count += 1
+
+            # 地址分割成tag, index, offset
+            if address >= addr_space:
+                raise ValueError("Address out of range")
+            offset = address & offset_mask
+            block = lines[(address >> block_shift) & set_mask]
+
+            if block and block.tag == address >> tag_shift:
+                # 命中
+                self.write_hit_count += 1
+
+                # 更新数据
+                block.data[offset] = data & 0xFF
+
+                # 写回：标记为脏
+                block.dirty = True
+            else:
+                # 未命中直接写入内存
+                memory.write(address, data)
+
+        return read, write
+
+    def reset_stats(self):
+        """清零统计数据；access_count/hit_count为只读属性，随读写计数一起归零"""
         self.read_count = 0
         self.write_count = 0
         self.read_hit_count = 0
         self.write_hit_count = 0
 
-        # 时间戳
-        self.time = 0
-        
-        # 初始化Cache组
-        self.sets = {}
-        for i in range(self.set_count):
-            self.sets[i] = CacheSet(self.associativity, self.policy,self.memory)
-        
+    @property
+    def access_count(self):
+        """总访问次数"""
+        return self.read_count + self.write_count
 
-    def address_split(self,address):
-        """地址分割成tag, index, offset"""
-        if address >= 2**self.address_bit:
-            raise ValueError("Address out of range")
-        offset = address % self.block_size
-        index = (address // self.block_size) % self.set_count
-        tag = address // (self.block_size * self.set_count)
-        return tag, index, offset
-    
-    
-    def read(self, address, memory):
-        """从Cache读取数据,如果不命中则从内存读取"""
-        self.access_count += 1
-        self.read_count += 1
-        self.time += 1
-        
-        tag, index, offset = self.address_split(address)
-        cache_set = self.sets[index]
-        
-        # 检查是否命中
-        block = cache_set.find_block(tag)
-        if block and block.valid:
-            # 命中
-            self.hit_count += 1
-            self.read_hit_count += 1
-
-            # 更新时间戳
-            if self.policy == 'LRU':
-                block.last_time = self.time
-            
-            return block.data[offset] if block.data else None
-        else:
-            # 未命中，从内存读取
-            block_address = (address // self.block_size) * self.block_size
-            data = []
-            for i in range(self.block_size):
-                if block_address + i < 2**self.address_bit:
-                    data.append(memory.read(block_address + i))
-            
-            # 创建新的Cache块
-            new_block = CacheBlock(self.block_size)            
-            new_block.tag = tag
-            new_block.valid = True
-            new_block.dirty = False
-            new_block.data = data
-            new_block.base_address = block_address
-            new_block.load_time = self.time
-            new_block.last_time = self.time            
-            
-            # 将块添加到Cache
-            cache_set.add_block(new_block)
+    @property
+    def hit_count(self):
+        """总命中次数"""
+        return self.read_hit_count + self.write_hit_count
 
-            return data[offset] if data else None
-    
-    def write(self, address, data, memory):
-        """写入数据到Cache"""
-        self.access_count += 1
-        self.write_count += 1
-        self.time += 1
-        
-        tag, index, offset = self.address_split(address)
-        cache_set = self.sets[index]
-        
-        # 检查是否命中
-        block = cache_set.find_block(tag)
-        if block and block.valid:
-            # 命中
-            self.hit_count += 1
-            self.write_hit_count += 1
-            
-            # 更新数据
-            if not block.data:
-                block.data = [None] * self.block_size
-            block.data[offset] = data
-            
-            # 写回：标记为脏
-            block.dirty = True
-            # 更新时间戳
-            if self.policy == 'LRU':
-                block.last_time = self.time
-        else:
-            # 未命中直接写入内存
-            memory.write(address, data)
-    
     def get_hit_rate(self):
         """获取命中率"""
         if self.access_count == 0:
@@ -244,27 +331,34 @@ class Cache:
         print(f"写命中率: {self.get_write_hit_rate():.4f}")  
 
 
+def parse_trace(filename):
+    """逐行解析跟踪文件，依次产生(操作类型, 地址, 写入数据)，读操作的写入数据为0"""
+    with open(filename, 'r',encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 2 or parts[0].startswith('#'):
+                continue
+
+            op = parts[0].lower() # 每行第一部分：操作类型
+            address = int(parts[1], 16)  # 每行第二部分：操作地址 假设地址是十六进制
+
+            if op == 'r' or op == 'read':
+                yield OP_READ, address, 0
+            elif op == 'w' or op == 'write':
+                data = int(parts[2]) if len(parts) > 2 else 1  #对写入行的第三部分：操作数 默认写入1
+                yield OP_WRITE, address, data
+
 def trace_file(cache, memory, filename):
     """从跟踪文件执行指令"""
     try:
-        with open(filename, 'r',encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                
-                op = parts[0].lower() # 每行第一部分：操作类型
-                address = int(parts[1], 16)  # 每行第二部分：操作地址 假设地址是十六进制
-                
-                if op == 'r' or op == 'read' or op =='R':
-                    cache.read(address, memory)
-                elif op == 'w' or op == 'write' or op == 'W':
-                    data = int(parts[2]) if len(parts) > 2 else 1  #对写入行的第三部分：操作数 默认写入1
-                    cache.write(address, data, memory)
+        # 边解析边执行，不在内存中保存整个跟踪文件
+        read = cache.read
+        write = cache.write
+        for op, address, data in parse_trace(filename):
+            if op == OP_READ:
+                read(address, memory)
+            else:
+                write(address, data, memory)
         
         print(f"跟踪文件 {filename} 执行完成")
         cache.print_stats()
@@ -274,19 +368,24 @@ def trace_file(cache, memory, filename):
 def random_access(cache, memory, count, read_ratio=0.7, address_range=None):
     """随机访问测试"""
     if address_range is None:
-        address_range = 2**cache.address_bit
+        address_range = cache._addr_space
     else:
-        address_range = min(address_range, 2**cache.address_bit)
+        address_range = min(address_range, cache._addr_space)
     
+    # 循环外绑定局部变量，避免每次迭代的属性查找
+    randrange = random.randrange
+    rand = random.random
+    read = cache.read
+    write = cache.write
+
     for _ in range(count):
-        address = random.randint(0, address_range - 1)
-        if random.random() < read_ratio:
+        address = randrange(address_range)
+        if rand() < read_ratio:
             # 执行读操作
-            cache.read(address, memory)
+            read(address, memory)
         else:
             # 执行写操作
-            data = random.randint(0, 255)
-            cache.write(address, data, memory)
+            write(address, randrange(256), memory)
     
     print(f"随机访问测试执行完成 ({count} 次操作)")
     cache.print_stats()
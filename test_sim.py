@@ -0,0 +1,99 @@
+"""Cache模拟器的回归测试，运行：python -m unittest test_sim"""
+import contextlib
+import io
+import os
+import random
+import unittest
+
+import sim
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_sequence(cache, memory, seed, count):
+    """按固定种子执行读写混合访问，返回所有读操作的结果"""
+    rng = random.Random(seed)
+    reads = []
+    for _ in range(count):
+        address = rng.randrange(memory.size)
+        if rng.random() < 0.6:
+            reads.append(cache.read(address, memory))
+        else:
+            cache.write(address, rng.randrange(256), memory)
+    return reads
+
+
+def stats(cache, memory):
+    """(读次数, 读命中, 写次数, 写命中, 内存访问次数)"""
+    return (cache.read_count, cache.read_hit_count, cache.write_count,
+            cache.write_hit_count, memory.access_count)
+
+
+class DirectMappedTest(unittest.TestCase):
+    """相联度为1时走专用读写路径，结果须与原始实现和通用组相联路径一致"""
+
+    # 以下期望值由优化前的原始实现(逐块查找/逐字节读写)在相同输入下得到
+    BASELINE_SEQUENCE = {
+        (256, 16): (3031, 200, 1969, 125, 49076),
+        (512, 64): (3031, 359, 1969, 265, 188200),
+    }
+    BASELINE_TRACE = {
+        'space.txt': (288, 236, 284, 0, 1116),
+        'time.txt': (398, 96, 366, 0, 5198),
+    }
+
+    def test_sequence_matches_baseline(self):
+        for (cache_size, block_size), expected in self.BASELINE_SEQUENCE.items():
+            for policy in ('FIFO', 'LRU', 'RANDOM'):
+                with self.subTest(cache_size=cache_size, block_size=block_size, policy=policy):
+                    memory = sim.Memory(1 << 12)
+                    cache = sim.Cache(cache_size, block_size, 1, policy, 12, memory)
+                    run_sequence(cache, memory, 7, 5000)
+                    self.assertEqual(stats(cache, memory), expected)
+
+    def test_trace_matches_baseline(self):
+        for name, expected in self.BASELINE_TRACE.items():
+            with self.subTest(trace=name):
+                memory = sim.Memory(1 << 16)
+                cache = sim.Cache(128, 16, 1, 'LRU', 16, memory)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    sim.trace_file(cache, memory, os.path.join(HERE, name))
+                self.assertEqual(stats(cache, memory), expected)
+
+    def test_matches_set_assoc_path(self):
+        for block_size in (4, 16, 64):
+            with self.subTest(block_size=block_size):
+                direct_memory = sim.Memory(1 << 12)
+                direct = sim.Cache(512, block_size, 1, 'LRU', 12, direct_memory)
+
+                # 同样参数的Cache改用通用组相联读写函数，作为对照
+                generic_memory = sim.Memory(1 << 12)
+                generic = sim.Cache(512, block_size, 1, 'LRU', 12, generic_memory)
+                generic.sets = [sim.CacheSet(1, 'LRU', generic_memory) for _ in range(generic.set_count)]
+                generic.read, generic.write = generic._make_set_assoc_access()
+
+                self.assertEqual(run_sequence(direct, direct_memory, 11, 5000),
+                                 run_sequence(generic, generic_memory, 11, 5000))
+                self.assertEqual(stats(direct, direct_memory), stats(generic, generic_memory))
+                self.assertEqual(direct_memory.data, generic_memory.data)
+
+
+class StatsTest(unittest.TestCase):
+    """统计数据"""
+
+    def test_reset_stats(self):
+        memory = sim.Memory(1 << 10)
+        cache = sim.Cache(128, 16, 2, 'LRU', 10, memory)
+        run_sequence(cache, memory, 3, 200)
+        self.assertEqual(cache.access_count, cache.read_count + cache.write_count)
+        self.assertGreater(cache.hit_count, 0)
+
+        cache.reset_stats()
+        self.assertEqual((cache.access_count, cache.hit_count), (0, 0))
+        self.assertEqual(cache.get_hit_rate(), 0)
+        with self.assertRaises(AttributeError):
+            cache.access_count = 0
+
+
+if __name__ == '__main__':
+    unittest.main()